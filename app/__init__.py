@@ -9,21 +9,33 @@ from flask_cors import CORS
 from .routes.ideas import ideas
 from .routes.users import users
 
+from .cache import BCRYPT_ROUNDS_RANGE, DEFAULT_BCRYPT_ROUNDS, SaltPool, TTLCache
 from .db import init_driver, get_driver
+from .models.user import calibrate_bcrypt_rounds, dummy_hash
+from .json_provider import OrjsonProvider
 from .seed import reset_db, set_db_properties, dump_db, import_dev_data
 
 
-def create_app():
-    """Initialize the application"""
+def create_app(test_config=None):
+    """Initialize the application, optionally overriding config for tests"""
 
     app = Flask(__name__, instance_relative_config=False)
 
+    app.json = OrjsonProvider(app)
+
     app.config.from_mapping(
         SECRET_KEY=os.getenv("FLASK_SECRET", "secret"),
         JWT_SECRET_KEY=os.getenv("JWT_SECRET", "secret"),
+        JWT_ALGORITHM=os.getenv("JWT_ALGORITHM", "HS256"),
+        JWT_PRIVATE_KEY=os.getenv("JWT_PRIVATE_KEY"),
+        JWT_PUBLIC_KEY=os.getenv("JWT_PUBLIC_KEY"),
         JWT_AUTH_HEADER_PREFIX="Bearer",
         JWT_VERIFY_CLAIMS="signature",
         JWT_EXPIRATION_DELTA=timedelta(360),
+        BCRYPT_ROUNDS=os.getenv("SALT_ROUNDS") or DEFAULT_BCRYPT_ROUNDS,
+        BCRYPT_TIME_BUDGET=float(os.getenv("BCRYPT_TIME_BUDGET") or 0.15),
+        USER_CACHE_TTL=float(os.getenv("USER_CACHE_TTL") or 15),
+        USER_CACHE_SIZE=10_000,
     )
 
     if os.getenv("FLASK_DEBUG") == "false":
@@ -40,8 +52,30 @@ def create_app():
             NEO4J_URI="neo4j://localhost:7687",
             NEO4J_USERNAME="neo4j",
             NEO4J_PASSWORD="test",
+            NEO4J_DATABASE="neo4j",
         ),
 
+    if test_config is not None:
+        app.config.from_mapping(test_config)
+
+    rounds = str(app.config["BCRYPT_ROUNDS"]).strip()
+    if rounds == "calibrate":
+        # Opt-in only: each worker calibrates on its own and may pick another cost
+        rounds = calibrate_bcrypt_rounds(app.config["BCRYPT_TIME_BUDGET"])
+    elif not rounds.isdigit() or int(rounds) not in BCRYPT_ROUNDS_RANGE:
+        app.logger.warning(
+            "Ignoring SALT_ROUNDS=%s, which bcrypt doesn't accept (4-31)", rounds
+        )
+        rounds = DEFAULT_BCRYPT_ROUNDS
+    app.config["BCRYPT_ROUNDS"] = int(rounds)
+
+    app.extensions["bcrypt_salts"] = SaltPool(app.config["BCRYPT_ROUNDS"])
+    # Built up front so the first unknown-email login isn't slower than the rest
+    app.extensions["bcrypt_dummy_hash"] = dummy_hash(app.config["BCRYPT_ROUNDS"])
+    app.extensions["user_cache"] = TTLCache(
+        app.config["USER_CACHE_SIZE"], app.config["USER_CACHE_TTL"]
+    )
+
     with app.app_context():
         driver = init_driver(
             app.config.get("NEO4J_URI"),
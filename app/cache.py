@@ -0,0 +1,105 @@
+"""Small in-process caches"""
+
+import logging
+from queue import Empty, Queue
+from threading import Event, Lock, Thread
+from time import monotonic
+
+import bcrypt
+
+logger = logging.getLogger(__name__)
+
+# Costs bcrypt.gensalt accepts
+BCRYPT_ROUNDS_RANGE = range(4, 32)
+
+# bcrypt.gensalt's own default, used when SALT_ROUNDS is unset or invalid
+DEFAULT_BCRYPT_ROUNDS = 12
+
+
+class TTLCache:
+    """
+    Thread-safe mapping whose entries expire after ttl seconds.
+    When full, the oldest entry is dropped to make room.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = {}
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires, value = item
+            if expires < monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key, value) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            if len(self._data) >= self.maxsize:
+                del self._data[next(iter(self._data))]
+            self._data[key] = (monotonic() + self.ttl, value)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[1]
+
+
+class SaltPool:
+    """
+    Bounded queue of bcrypt salts, kept topped up by a daemon thread so
+    requests don't have to generate their own.
+    Falls back to generating a salt directly when the queue is empty.
+    """
+
+    def __init__(self, rounds: int, maxsize: int = 64):
+        if rounds not in BCRYPT_ROUNDS_RANGE:
+            raise ValueError(f"Invalid bcrypt rounds: {rounds}")
+
+        self.rounds = rounds
+        self._salts = Queue(maxsize)
+        self._low = Event()
+        self._low.set()
+        Thread(target=self._refill, daemon=True).start()
+
+    def _refill(self) -> None:
+        while True:
+            self._low.wait()
+            self._low.clear()
+            try:
+                while not self._salts.full():
+                    self._salts.put(bcrypt.gensalt(self.rounds))
+            except Exception:
+                # Keep the thread alive; get() still works without pooled salts
+                logger.exception("Could not pregenerate bcrypt salts")
+
+    def get(self, rounds: int) -> bytes:
+        """
+        Get a salt for the given cost. If the cost has changed since the
+        pooled salts were made, they are thrown away as they come up.
+        """
+        self.rounds = rounds
+        prefix = b"%02d" % rounds
+
+        while True:
+            try:
+                salt = self._salts.get_nowait()
+            except Empty:
+                salt = bcrypt.gensalt(rounds)
+                break
+            if salt[4:6] == prefix:
+                break
+
+        if self._salts.qsize() < self._salts.maxsize // 2:
+            self._low.set()
+
+        return salt
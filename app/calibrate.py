@@ -0,0 +1,23 @@
+"""Print a bcrypt cost factor for SALT_ROUNDS without starting the app"""
+
+import click
+
+from app.models.user import calibrate_bcrypt_rounds
+
+
+@click.command()
+@click.option(
+    "--budget",
+    type=float,
+    default=0.15,
+    envvar="BCRYPT_TIME_BUDGET",
+    show_default=True,
+    help="Seconds a single hash may take on this machine.",
+)
+def main(budget: float):
+    """Print the SALT_ROUNDS that fits the time budget on this machine"""
+    click.echo(f"SALT_ROUNDS={calibrate_bcrypt_rounds(budget)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """User model"""
 
-from datetime import datetime
+from time import perf_counter, time
+from typing import Final
 import jwt
 import bcrypt
 from flask import current_app
@@ -9,6 +10,56 @@ from neo4j.exceptions import ConstraintError
 from app.exceptions.validation_exception import ValidationException
 from app.types import RegistrationData, User, UserToken, UserData
 
+# bcrypt ignores everything past this many bytes of password
+_BCRYPT_MAX_BYTES: Final[int] = 72
+
+
+##############################################################################
+# Cypher queries
+#
+
+_CREATE_USER_CYPHER: Final[str] = """
+    CREATE (u:User {
+        userId: randomUuid(),
+        email: $email,
+        password: $encrypted,
+        username: $username
+    })
+    RETURN u
+"""
+
+_USER_BY_EMAIL_CYPHER: Final[str] = """
+    MATCH (u:User {email: $email})
+    RETURN u {
+        .*
+    }
+"""
+
+_USER_BY_ID_CYPHER: Final[str] = """
+    MATCH (u:User {userId: $user_id})
+    RETURN u {
+        .*
+    }
+"""
+
+_USER_HASH_BY_ID_CYPHER: Final[str] = """
+    MATCH (u:User {userId: $user_id})
+    RETURN u.password AS password
+"""
+
+_UPDATE_USER_CYPHER: Final[str] = """
+    MATCH (u:User {userId: $user_id})
+    SET u.username = coalesce($username, u.username),
+        u.email = coalesce($email, u.email),
+        u.password = coalesce($password, u.password)
+    RETURN u {
+        userId: u.userId,
+        username: u.username,
+        email: u.email
+    }
+"""
+
+
 ##############################################################################
 # Transaction functions
 #
@@ -17,58 +68,53 @@ from app.types import RegistrationData, User, UserToken, UserData
 def create_user(tx, email: str, encrypted: str, username: str) -> User:
     """Transaction function for adding a new user to the database"""
     return tx.run(
-        """
-        CREATE (u:User {
-            userId: randomUuid(),
-            email: $email,
-            password: $encrypted,
-            username: $username
-        })
-        RETURN u
-        """,
+        _CREATE_USER_CYPHER,
         email=email,
         encrypted=encrypted,
         username=username,
     ).single()
 
 
+def _single_value(result, key: str):
+    """Value of key in the only record of a result, or None if there was none"""
+    record = result.single()
+    return None if record is None else record[key]
+
+
 def user_by_email(tx, email: str) -> User | None:
     """
     Transaction function for getting a user from the database
     TODO: Let user be found by username as well
     """
-    user = tx.run(
-        """
-        MATCH (u:User {email: $email})
-        RETURN u {
-            .*
-        }
-        """,
-        email=email,
-    ).single()
-
-    if user is None:
-        return None
-
-    return user.get("u")
+    return _single_value(tx.run(_USER_BY_EMAIL_CYPHER, email=email), "u")
 
 
 def user_by_id(tx, user_id: str) -> User | None:
     """Transaction function for getting a user from the database"""
+    return _single_value(tx.run(_USER_BY_ID_CYPHER, user_id=user_id), "u")
+
+
+def user_hash_by_id(tx, user_id: str) -> str | None:
+    """Transaction function for getting only a user's password hash"""
+    return _single_value(tx.run(_USER_HASH_BY_ID_CYPHER, user_id=user_id), "password")
+
+
+def _update_user(
+    tx,
+    user_id: str,
+    username: str | None,
+    email: str | None,
+    password: str | None,
+) -> UserData:
+    """Transaction function for changing any of a user's details at once"""
     user = tx.run(
-        """
-        MATCH (u:User {userId: $user_id})
-        RETURN u {
-            .*
-        }
-        """,
+        _UPDATE_USER_CYPHER,
         user_id=user_id,
+        username=username,
+        email=email,
+        password=password,
     ).single()
-
-    if user is None:
-        return None
-
-    return user.get("u")
+    return user[0]
 
 
 ##############################################################################
@@ -79,12 +125,10 @@ def user_by_id(tx, user_id: str) -> User | None:
 def register(driver, data: RegistrationData) -> UserToken:
     """Register a new user"""
 
-    encrypted = bcrypt.hashpw(data["password"].encode("utf8"), bcrypt.gensalt()).decode(
-        "utf8"
-    )
+    encrypted = _hash_password(data["password"])
 
     try:
-        with driver.session() as session:
+        with driver.session(database=_database()) as session:
             result = session.execute_write(
                 create_user, data["email"], encrypted, data["username"]
             )
@@ -100,10 +144,7 @@ def register(driver, data: RegistrationData) -> UserToken:
         "username": user["username"],
     }
 
-    # Generate Token
-    payload["token"] = generate_token(payload)
-
-    return payload
+    return _user_token(payload)
 
 
 def authenticate(driver, email: str, password: str) -> UserToken | bool:
@@ -113,32 +154,48 @@ def authenticate(driver, email: str, password: str) -> UserToken | bool:
     If unsuccessful, return False
     """
 
-    with driver.session() as session:
+    with driver.session(database=_database()) as session:
         user = session.execute_read(user_by_email, email)
 
     if user is None:
+        # Spend the same time as a wrong password so unknown emails don't stand out
+        _check_password(password, current_app.extensions["bcrypt_dummy_hash"])
         return False
 
-    if (
-        bcrypt.checkpw(password.encode("utf-8"), user["password"].encode("utf-8"))
-        is False
-    ):
+    if _check_password(password, user["password"]) is False:
         return False
 
+    if _hash_rounds(user["password"]) != current_app.config["BCRYPT_ROUNDS"]:
+        # Move hashes made at an older cost (e.g. bcrypt's default of 12) to the
+        # current one, so every stored hash ends up costing the same to check
+        encrypted = _hash_password(password)
+        with driver.session(database=_database()) as session:
+            session.execute_write(_update_user, user["userId"], None, None, encrypted)
+        current_app.extensions["user_cache"].pop(user["userId"])
+
     payload = {
         "userId": user["userId"],
         "email": user["email"],
         "username": user["username"],
     }
 
-    payload["token"] = generate_token(payload)
-
-    return payload
+    return _user_token(payload)
 
 
 def find_user(driver, user_id: str) -> User | None:
-    with driver.session() as session:
-        return session.execute_read(user_by_id, user_id)
+    """Find a user by id, using the short-lived user cache when possible"""
+    cache = current_app.extensions["user_cache"]
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+
+    with driver.session(database=_database()) as session:
+        user = session.execute_read(user_by_id, user_id)
+
+    if user is not None:
+        cache.set(user_id, user)
+
+    return user
 
 
 def edit_user(
@@ -151,86 +208,37 @@ def edit_user(
 ) -> UserToken:
     """Edit an existing user"""
 
-    def update_username(tx, user_id: str, username: str):
-        return tx.run(
-            """
-            MATCH (u:User {userId: $user_id})
-            SET u.username = $username
-            RETURN u {
-                userId: u.userId,
-                username: u.username,
-                email: u.email
-            }
-            """,
-            user_id=user_id,
-            username=username,
-        ).single()[0]
-
-    def update_email(tx, user_id: str, email: str):
-        return tx.run(
-            """
-            MATCH (u:User {userId: $user_id})
-            SET u.email = $email
-            RETURN u {
-                userId: u.userId,
-                username: u.username,
-                email: u.email
-            }
-            """,
-            user_id=user_id,
-            email=email,
-        ).single()[0]
-
-    def update_password(tx, user_id: str, password: str):
-        return tx.run(
-            """
-            MATCH (u:User {userId: $user_id})
-            SET u.password = $password
-            RETURN u {
-                userId: u.userId,
-                username: u.username,
-                email: u.email
-            }
-            """,
-            user_id=user_id,
-            password=password,
-        ).single()[0]
-
-    with driver.session() as session:
+    with driver.session(database=_database()) as session:
 
-        user = session.execute_read(user_by_id, user_id)
+        hashed = session.execute_read(user_hash_by_id, user_id)
 
-        if user is None:
+        if hashed is None:
             raise ValidationException(
                 "Invalid password",
                 {"details": None},
             )
 
-        if (
-            bcrypt.checkpw(
-                current_password.encode("utf-8"), user["password"].encode("utf-8")
-            )
-            is False
-        ):
+        if _check_password(current_password, hashed) is False:
             raise ValidationException(
                 "Invalid password",
                 {"details": None},
             )
 
+        encrypted = _hash_password(new_password) if new_password else None
+
         try:
-            if new_username:
-                user = session.execute_write(update_username, user_id, new_username)
-            if new_email:
-                user = session.execute_write(update_email, user_id, new_email)
+            user = session.execute_write(
+                _update_user,
+                user_id,
+                new_username or None,
+                new_email or None,
+                encrypted,
+            )
 
         except ConstraintError as err:
             raise ValidationException(err.message, {"email": err.message})
 
-        if new_password:
-            encrypted = bcrypt.hashpw(
-                new_password.encode("utf8"), bcrypt.gensalt()
-            ).decode("utf8")
-            user = session.execute_write(update_password, user_id, encrypted)
+        current_app.extensions["user_cache"].pop(user_id)
 
         payload = {
             "userId": user["userId"],
@@ -238,12 +246,7 @@ def edit_user(
             "username": user["username"],
         }
 
-        # Generate Token
-        # token = generate_token(user_data)
-        # return token
-        payload["token"] = generate_token(payload)
-
-        return payload
+        return _user_token(payload)
 
 
 ##############################################################################
@@ -251,42 +254,114 @@ def edit_user(
 #
 
 
-def generate_token(payload: UserData) -> UserToken:
+def _database() -> str | None:
+    """Name of the configured Neo4j database, so sessions skip home db lookup"""
+    return current_app.config.get("NEO4J_DATABASE")
+
+
+def _hash_password(password: str) -> str:
+    """Hash a password using a pregenerated salt at the configured cost factor"""
+    pw_bytes = password.encode("utf8")[:_BCRYPT_MAX_BYTES]
+    rounds = current_app.config["BCRYPT_ROUNDS"]
+    salt = current_app.extensions["bcrypt_salts"].get(rounds)
+    return bcrypt.hashpw(pw_bytes, salt).decode("ascii")
+
+
+def dummy_hash(rounds: int) -> bytes:
+    """Hash to check against when there is no user, so misses take as long as hits"""
+    return bcrypt.hashpw(b"x", bcrypt.gensalt(rounds))
+
+
+def _hash_rounds(hashed: str) -> int:
+    """Cost factor a bcrypt hash was made with, read from its $2b$NN$ prefix"""
+    return int(hashed[4:6])
+
+
+def _check_password(password: str, hashed: str | bytes) -> bool:
+    """
+    Check a password against a stored hash.
+    Hashes are stored as strings, but bcrypt output is pure ASCII, so raw bytes
+    are used as they are and strings only need one encode.
+    bcrypt only reads the first 72 bytes, so longer passwords are cut short
+    before they reach the C layer.
     """
-    Generate a JWT
-    TODO Change this from the Neo4j example project to be functional
+    pw_bytes = password.encode("utf-8")[:_BCRYPT_MAX_BYTES]
+    hash_bytes = hashed if isinstance(hashed, bytes) else hashed.encode("ascii")
+    return bcrypt.checkpw(pw_bytes, hash_bytes)
+
+
+def calibrate_bcrypt_rounds(budget: float, min_rounds=10, max_rounds=14) -> int:
     """
-    iat = datetime.utcnow()
-    jwt_secret = current_app.config.get("JWT_SECRET_KEY")
+    Find the largest bcrypt cost factor that hashes within budget seconds.
+    Never goes below min_rounds, even on a slow machine.
+    """
+    rounds = min_rounds
+    for candidate in range(min_rounds, max_rounds + 1):
+        start = perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(candidate))
+        if perf_counter() - start > budget:
+            break
+        rounds = candidate
+
+    return rounds
+
+
+def generate_claims(user: UserData) -> dict:
+    """Build the JWT claims for a user without touching the given dict"""
+    iat = int(time())
+    expiration_delta = current_app.config["JWT_EXPIRATION_DELTA"]
+
+    return {
+        **user,
+        "sub": user["userId"],
+        "iat": iat,
+        "nbf": iat,
+        "exp": iat + int(expiration_delta.total_seconds()),
+    }
 
-    # token_data = {
-    #     **data,
-    #     "sub": data["userId"],
-    #     "iat": iat,
-    #     "nbbf": iat,
-    #     "ext": iat + current_app.config.get("JWT_EXPIRATION_DELTA"),
-    # }
-    # token = {
-    #     **token_data,
-    #     "token": jwt.encode(token_data, jwt_secret, algorithm="HS256"),
-    # }
 
-    # return token
-    payload["sub"] = payload["userId"]
-    payload["iat"] = iat
-    payload["nbf"] = iat
-    payload["exp"] = iat + current_app.config.get("JWT_EXPIRATION_DELTA")
+def generate_token(claims: dict) -> str:
+    """Generate a JWT"""
+    config = current_app.config
+    algorithm = config["JWT_ALGORITHM"]
+    # Asymmetric algorithms (e.g. EdDSA) sign with the private key
+    jwt_secret = (
+        config["JWT_SECRET_KEY"]
+        if algorithm.startswith("HS")
+        else config["JWT_PRIVATE_KEY"]
+    )
+
+    return jwt.encode(claims, jwt_secret, algorithm=algorithm)
 
-    jwt_secret = current_app.config.get("JWT_SECRET_KEY")
 
-    return jwt.encode(payload, jwt_secret, algorithm="HS256")  # .decode("ascii")
+def _user_token(user: UserData) -> UserToken:
+    """User details plus their claims and a signed token"""
+    claims = generate_claims(user)
+    return {**claims, "token": generate_token(claims)}
 
 
-def decode_token(auth_token, jwt_secret):
-    """Attempt to decode a JWT"""
+def decode_token(auth_token, jwt_secret=None, algorithm: str | None = None):
+    """
+    Attempt to decode a JWT.
+    Defaults to the app's JWT_ALGORITHM, verifying with the public key
+    for asymmetric algorithms and the shared secret otherwise.
+    """
+    config = current_app.config
+    algorithm = algorithm or config["JWT_ALGORITHM"]
+    if jwt_secret is None:
+        jwt_secret = (
+            config["JWT_SECRET_KEY"]
+            if algorithm.startswith("HS")
+            else config["JWT_PUBLIC_KEY"]
+        )
 
     try:
-        payload = jwt.decode(auth_token, jwt_secret)
+        payload = jwt.decode(
+            auth_token,
+            jwt_secret,
+            algorithms=[algorithm],
+            options={"require": ["exp", "iat", "sub"]},
+        )
         return payload
     except jwt.ExpiredSignatureError:
         return None
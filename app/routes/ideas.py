@@ -3,8 +3,8 @@
 from flask import Blueprint, jsonify, request, current_app
 from flask.wrappers import Response
 from flask_jwt_extended import jwt_required, get_jwt
-from flask_expects_json import expects_json
 
+from app.validation import validate_json
 from app.models.idea import (
     add_idea,
     random_idea,
@@ -40,16 +40,23 @@ post_reaction_schema = {
 }
 
 
+def _current_user_id() -> str | None:
+    """
+    Id of the user in the JWT that @jwt_required already verified.
+    get_jwt() reads the decoded token cached on g, so this doesn't decode again.
+    """
+    return get_jwt().get("userId", None)
+
+
 @ideas.post("/")
-@expects_json(post_idea_schema)
+@validate_json(post_idea_schema)
 @jwt_required()
 def post_idea() -> tuple[Response, int]:
     """Post a new idea"""
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
-    data = request.get_json()
+    data = request.get_json(cache=True)
     url = data.get("url", None)
     description = data.get("description", None)
     source_id = data.get("sourceId", None)
@@ -81,8 +88,7 @@ def get_idea() -> tuple[Response, int]:
 def get_unseen_idea() -> tuple[Response, int]:
     """Get a random idea that the user has not yet seen"""
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     idea = random_unseen_idea(current_app.driver, user_id)
 
@@ -96,8 +102,7 @@ def get_unseen_idea() -> tuple[Response, int]:
 @jwt_required()
 def get_popular_idea() -> tuple[Response, int]:
     """Get the most liked idea that the user has not yet seen"""
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     idea = popular_unseen_idea(current_app.driver, user_id)
 
@@ -112,8 +117,7 @@ def get_popular_idea() -> tuple[Response, int]:
 def disagreeable_idea():
     """Get an idea that the user should be interested in but disagree with"""
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     idea = get_disagreeable_idea(current_app.driver, user_id)
 
@@ -128,8 +132,7 @@ def disagreeable_idea():
 def agreeable_idea():
     """Get an idea that the user should be interested in but disagree with"""
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     idea = get_agreeable_idea(current_app.driver, user_id)
 
@@ -140,20 +143,20 @@ def agreeable_idea():
 
 
 @ideas.post("/<string:idea_id>/react")
-@expects_json(post_reaction_schema)
+@validate_json(post_reaction_schema)
 @jwt_required()
 def react_to_idea(idea_id):
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
-    data = request.get_json()
+    data = request.get_json(cache=True)
     type = data["type"]
+    driver = current_app.driver
 
     if type == "like":
-        reaction = like_idea(current_app.driver, user_id, idea_id, data["agreement"])
+        reaction = like_idea(driver, user_id, idea_id, data["agreement"])
     else:
-        reaction = dislike_idea(current_app.driver, user_id, idea_id)
+        reaction = dislike_idea(driver, user_id, idea_id)
 
     if reaction is None:
         return (jsonify(msg="Reaction could not be saved."), 400)
@@ -164,8 +167,7 @@ def react_to_idea(idea_id):
 @ideas.get("/viewed")
 @jwt_required()
 def viewed_ideas():
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     ideas = get_seen_ideas(current_app.driver, user_id)
 
@@ -176,8 +178,7 @@ def viewed_ideas():
 @jwt_required()
 def viewed_ideas_with_relationships():
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     ideas = get_all_seen_ideas_with_user_and_aggregate_reactions(
         current_app.driver, user_id
@@ -190,8 +191,7 @@ def viewed_ideas_with_relationships():
 @jwt_required()
 def idea_reactions(idea_id):
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     idea = get_idea_details(current_app.driver, idea_id, True, user_id)
     if idea is None:
@@ -211,16 +211,16 @@ def idea_reactions(idea_id):
 @jwt_required()
 def idea_details(idea_id):
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
 
     with_reactions = request.args.get("with-reactions", None) == "true"
     with_user_reaction = request.args.get("with-user-reaction", None) == "true"
+    driver = current_app.driver
 
     if with_user_reaction:
-        idea = get_idea_details(current_app.driver, idea_id, True, user_id)
+        idea = get_idea_details(driver, idea_id, True, user_id)
     else:
-        idea = get_idea_details(current_app.driver, idea_id, with_reactions)
+        idea = get_idea_details(driver, idea_id, with_reactions)
 
     if idea is None:
         return (jsonify(msg="Idea not found."), 404)
@@ -232,10 +232,7 @@ def idea_details(idea_id):
 @jwt_required()
 def delete_single_idea(idea_id):
 
-    claims = get_jwt()
-    user_id = claims.get("userId", None)
-
-    user_id = claims.get("userId", None)
+    user_id = _current_user_id()
     query_res = delete_idea(current_app.driver, idea_id, user_id)
 
     return jsonify({"deleted": query_res})
@@ -246,8 +243,7 @@ def delete_single_idea(idea_id):
 def posted_by_user(user_id):
     """Get ideas posted by a user"""
 
-    claims = get_jwt()
-    current_user = claims.get("userId", None)
+    current_user = _current_user_id()
     if current_user != user_id:
         return (jsonify(msg="You are not authorized to view this resource"), 403)
 
@@ -2,8 +2,8 @@
 
 from flask import Blueprint, jsonify, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt
-from flask_expects_json import expects_json
 
+from app.validation import validate_json
 from app.models.user import register, authenticate, find_user, edit_user
 from app.exceptions.validation_exception import ValidationException
 
@@ -14,7 +14,7 @@ signup_schema = {
     "properties": {
         "email": {"type": "string"},
         "username": {"type": "string"},
-        "password": {"type": "string"},
+        "password": {"type": "string", "minLength": 1},
     },
     "required": ["email", "username", "password"],
 }
@@ -46,9 +46,9 @@ update_user_schema = {
 
 
 @users.post("/signup")
-@expects_json(signup_schema)
+@validate_json(signup_schema)
 def signup():
-    data = request.get_json()
+    data = request.get_json(cache=True)
 
     email = data["email"]
     password = data["password"]
@@ -66,9 +66,9 @@ def signup():
 
 
 @users.post("/login")
-@expects_json(login_schema)
+@validate_json(login_schema)
 def login():
-    data = request.get_json()
+    data = request.get_json(cache=True)
 
     email = data["email"]
     password = data["password"]
@@ -107,13 +107,13 @@ def get_user(user_id):
 
 
 @users.patch("/<string:user_id>")
-@expects_json(update_user_schema)
+@validate_json(update_user_schema)
 @jwt_required()
 def update_user(user_id):
 
     claims = get_jwt()
 
-    data = request.get_json()
+    data = request.get_json(cache=True)
     current_password = data.get("currentPassword", None)
     new_email = data.get("newEmail", None)
     new_password = data.get("newPassword", None)
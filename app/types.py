@@ -75,7 +75,7 @@ class UserToken(TypedDict):
     email: str
     username: str
     sub: str
-    iat: str
-    nbf: str
-    exp: str
+    iat: int
+    nbf: int
+    exp: int
     token: str
@@ -0,0 +1,36 @@
+"""Request body validation"""
+
+from functools import wraps
+
+from flask import abort, request
+from jsonschema import validators
+from jsonschema.exceptions import ValidationError
+
+
+def validate_json(schema: dict):
+    """
+    Reject requests whose JSON body doesn't match schema with a 400.
+    The schema is checked and the validator built once when the route is
+    defined, not on every request.
+    """
+    validator_class = validators.validator_for(schema)
+    validator_class.check_schema(schema)
+    validator = validator_class(schema)
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            data = request.get_json(cache=True)
+            if data is None:
+                return abort(400, "Failed to decode JSON object")
+
+            try:
+                validator.validate(data)
+            except ValidationError as err:
+                return abort(400, err)
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
@@ -1,4 +1,5 @@
 import os
+from functools import lru_cache
 
 import pytest
 from flask import Flask
@@ -6,14 +7,55 @@ from flask.testing import FlaskClient
 
 from app import create_app
 from app.db import init_driver, close_driver
+from app.seed import reset_db
 
 
-@pytest.fixture()
+@pytest.fixture(scope="session")
 def app() -> Flask:
-    app = create_app()
+    # create_app wipes and reseeds the one Neo4j database the tests share, so
+    # the suite has to run serially (no pytest-xdist): a second worker would
+    # reseed the database out from under the first.
+    # bcrypt's minimum cost keeps seeding and logins from dominating test time,
+    # and tokens (including those made while seeding) are signed with a fixed
+    # HMAC key whatever JWT_ALGORITHM the env sets.
+    app = create_app(
+        {"BCRYPT_ROUNDS": 4, "JWT_ALGORITHM": "HS256", "JWT_SECRET_KEY": "test"}
+    )
 
     app.config["TESTING"] = True
     app.config["DEBUG_TB_HOSTS"] = ["dont-show-debug-toolbar"]
     app.config["WTF_CSRF_ENABLED"] = False
 
     return app
+
+
+@pytest.fixture(scope="session")
+def client(app) -> FlaskClient:
+    return app.test_client()
+
+
+@pytest.fixture(scope="session")
+def login(client: FlaskClient):
+    """Log in as a user, reusing the response for repeat logins"""
+
+    @lru_cache
+    def login(email: str, password: str) -> dict:
+        return client.post(
+            "/api/users/login",
+            json={"email": email, "password": password},
+        ).json
+
+    return login
+
+
+@pytest.fixture()
+def reseed_db(app: Flask, login):
+    """
+    Put the seed data back after a test that changes it, since the app
+    (and so the database) is shared by the whole session.
+    Reseeding gives users new ids, so cached logins are dropped too.
+    """
+    yield
+    with app.app_context():
+        reset_db(app.driver)
+    login.cache_clear()